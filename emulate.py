@@ -1,64 +1,243 @@
 import enum
-from collections import Counter
+import functools
+import graphlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Union, Iterable, Tuple
 
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
 
 @enum.unique
-class State(enum.IntFlag):
+class State(enum.IntEnum):
+    """
+    Human-readable state values for the API boundary. Internally nodes hold a
+    plain int (0/1/2) so that the hot comparison paths in the gate calculate()
+    functions are single integer compares rather than enum machinery.
+    """
+
     low = 0
     high = 1
     z = 2
 
-    def __eq__(self, other):
-        if isinstance(other, Node):
-            return int(self) == int(other.state)
 
-        if not isinstance(other, State):
-            raise ValueError(
-                f"Cannot compare {other.__class__.__name__} class with a State class."
+# Plain-int aliases for hot user code that wants to skip enum member lookups
+# entirely; Node.state stores and compares raw ints either way.
+LOW = int(State.low)
+HIGH = int(State.high)
+Z = int(State.z)
+
+# Used by __str__ methods so nodes still print as "State.high" etc. even
+# though the stored value is a plain int.
+_STATE_NAMES = {int(s): f"State.{s.name}" for s in State}
+
+
+class NodeArena:
+    """
+    Structure-of-arrays storage for node states and versions. Every Node is
+    issued an integer id into these flat arrays, so a whole gate can be
+    evaluated with one vectorised numpy reduction over its input ids instead
+    of a Python-level loop over node objects.
+
+    states holds one uint8 per node (0=low, 1=high, 2=z; any value >= 1
+    counts as driven high by the gates), which keeps the reductions on
+    numpy's SIMD fast path while still representing high-Z. versions is the
+    parallel dirty-flag array used by the memoized calculate() path.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.states = np.zeros(capacity, dtype=np.uint8)
+        self.versions = np.zeros(capacity, dtype=np.int64)
+        self._next_id = 0
+
+    def allocate(self, n: int = 1) -> range:
+        """
+        Reserve n contiguous ids, growing the arrays geometrically in one
+        reallocation if needed. Contiguous ranges keep the ids of nodes
+        created together adjacent, which makes the gather patterns over
+        input ids cache-friendly; use this to preallocate a large circuit's
+        nodes in a single call.
+        """
+        start = self._next_id
+        needed = start + n
+        if needed > len(self.states):
+            capacity = len(self.states)
+            while capacity < needed:
+                capacity *= 2
+            self.states = np.concatenate(
+                [self.states, np.zeros(capacity - len(self.states), dtype=np.uint8)]
             )
+            self.versions = np.concatenate(
+                [self.versions, np.zeros(capacity - len(self.versions), dtype=np.int64)]
+            )
+        self._next_id = needed
+        return range(start, needed)
+
+    def new_id(self, state: int) -> int:
+        (node_id,) = self.allocate(1)
+        self.states[node_id] = state
+        return node_id
 
-        return int(self) == int(other)
+    def reset(self):
+        """Drop every issued id and zero the store; intended for tests."""
+        self.states = np.zeros(len(self.states), dtype=np.uint8)
+        self.versions = np.zeros(len(self.versions), dtype=np.int64)
+        self._next_id = 0
+
+
+# The default arena all nodes are allocated from.
+arena = NodeArena()
 
 
 class Node:
-    _id_counter: int = 1
+    __slots__ = ("id", "is_constant", "name")
 
-    def __init__(self, state: State = State.low, name: str = None):
-        self.state = state
-        Node._id_counter += 1
+    def __init__(
+        self, state: State = State.low, name: str = None, is_constant: bool = False
+    ):
+        self.id = arena.new_id(int(state))
+        self.is_constant = is_constant
         if name:
             self.name = name
         else:
-            self.name = f"Node{Node._id_counter}"
+            self.name = f"Node{self.id}"
+
+    @property
+    def state(self) -> int:
+        return int(arena.states[self.id])
+
+    @state.setter
+    def state(self, state: int):
+        # Only bump the version on a real change so downstream components can
+        # use it as a cheap "did my fanin move?" dirty flag.
+        state = int(state)
+        if state != arena.states[self.id]:
+            if self.is_constant:
+                raise ValueError(
+                    f"Cannot change the state of constant node {self.name}."
+                )
+            arena.states[self.id] = state
+            arena.versions[self.id] += 1
+
+    @property
+    def version(self) -> int:
+        return int(arena.versions[self.id])
+
+    def __eq__(self, other):
+        if isinstance(other, int):
+            return self.state == int(other)
+        return NotImplemented
+
+    __hash__ = object.__hash__
 
     def __str__(self):
-        return f"{self.name}: {str(self.state)}"
+        return f"{self.name}: {_STATE_NAMES.get(self.state, self.state)}"
+
+
+# Shared tie-off nodes, allocated first so they always occupy ids 0 and 1.
+# Wire unused enable pins and the like to these instead of allocating a
+# fresh Node per consumer: the store stays smaller and, because they are
+# constant, the folding pass in Circuit.initialize removes any gate whose
+# fanin is fully tied off.
+CONST_LOW = Node(State.low, name="ConstLow", is_constant=True)
+CONST_HIGH = Node(State.high, name="ConstHigh", is_constant=True)
 
 
 class NamedObjectList(list):
+    __slots__ = ("_by_name",)
+
     object_type_name = "Object"
 
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._by_name = None
+
     def __getitem__(self, index):
         if isinstance(index, int):
             return super().__getitem__(index)
         return self.get_object_by_name(index)
 
+    # Mutating the list drops the name index outright; renames are caught by
+    # the staleness check in get_object_by_name.
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._by_name = None
+
+    def append(self, value):
+        super().append(value)
+        self._by_name = None
+
+    def extend(self, values):
+        super().extend(values)
+        self._by_name = None
+
+    def insert(self, index, value):
+        super().insert(index, value)
+        self._by_name = None
+
+    def remove(self, value):
+        super().remove(value)
+        self._by_name = None
+
+    def pop(self, index=-1):
+        value = super().pop(index)
+        self._by_name = None
+        return value
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._by_name = None
+
+    def clear(self):
+        super().clear()
+        self._by_name = None
+
+    def __iadd__(self, values):
+        result = super().__iadd__(values)
+        self._by_name = None
+        return result
+
     def get_object_by_name(self, name: str) -> Node:
-        for n in self:
-            if n.name == name:
-                return n
+        by_name = self._by_name
+        if by_name is not None:
+            obj = by_name.get(name)
+            if obj is not None and obj.name == name:
+                return obj
+        # Build the index lazily, and rebuild it after any mutation or rename
+        # that made a cached entry stale. setdefault preserves the old
+        # first-match behaviour for duplicate names.
+        by_name = {}
+        for obj in self:
+            by_name.setdefault(obj.name, obj)
+        self._by_name = by_name
+        obj = by_name.get(name)
+        if obj is not None:
+            return obj
         raise ValueError(
             f'{self.object_type_name} {name} not found. Valid node names are ({", ".join(i.name for i in self)})'
         )
 
 
 class ComponentList(NamedObjectList):
+    __slots__ = ()
+
     object_type_name = "Component"
     pass
 
 
+@functools.lru_cache(maxsize=None)
+def _expected_name_set(expected_names: Tuple[str, ...]) -> frozenset:
+    return frozenset(expected_names)
+
+
 class NodeList(NamedObjectList):
+    __slots__ = ()
+
     object_type_name = "Node"
 
     def validate(
@@ -68,44 +247,75 @@ class NodeList(NamedObjectList):
         min_length=None,
         max_length=None,
     ):
-        if min_length and len(self) < min_length:
+        length = len(self)
+        if min_length is not None and length < min_length:
             raise ValueError(
                 f"{element_name} must have a minimum of {min_length} inputs."
             )
 
-        if max_length and len(self) > max_length:
+        if max_length is not None and length > max_length:
             raise ValueError(
                 f"{element_name} must have a maximum of {max_length} inputs."
             )
 
         if expected_names:
-            unexpected_names = set(i.name for i in self).difference(expected_names)
-            if len(unexpected_names) > 0:
+            # Build each set once and diff both ways, rather than re-walking
+            # the node list per check. The expected-name set is interned:
+            # every AndGate (say) passes the same literal list, so the set is
+            # built once per component class rather than once per instance.
+            names = {i.name for i in self}
+            expected = _expected_name_set(tuple(expected_names))
+            unexpected_names = names - expected
+            if unexpected_names:
                 raise ValueError(
-                    f'The following node names were not expected: {", ".join(i for i in unexpected_names)}'
+                    f'The following node names were not expected: {", ".join(sorted(unexpected_names))}'
                 )
 
-            missing_names = set(expected_names).difference(i.name for i in self)
-            if len(missing_names) > 0:
+            missing_names = expected - names
+            if missing_names:
                 raise ValueError(
-                    f'The following node names were missing: {", ".join(i for i in missing_names)}'
+                    f'The following node names were missing: {", ".join(sorted(missing_names))}'
                 )
 
     def __str__(self):
-        return f'[{", ".join([str(i) for i in self])}]'
+        return f'[{", ".join(map(str, self))}]'
 
 
 class ComponentBase:
-    _inputs = None
-    _outputs = None
-    _components: ComponentList = None
+    __slots__ = (
+        "_inputs",
+        "_input_tuple",
+        "_outputs",
+        "_components",
+        "_input_ids",
+        "_last_input_versions",
+        "_name",
+        "_str_prefix",
+        "_compiled",
+        "_truth_table",
+    )
 
     # A component can be made up from other components and these can be specified in this variable as a global list of
     # component types (not instances). If you need to use component instances then overload the get)instances function
     # and specify them there.
     components: Union[List, Tuple] = None
 
+    # Class name cached once per subclass so the default component name and
+    # validation messages avoid a reflective __name__ lookup per instance.
+    _display_name = "ComponentBase"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._display_name = cls.__name__
+
     def __init__(self, inputs: Union[NodeList, list] = None, name: str = None):
+        self._inputs = None
+        self._input_tuple = None
+        self._outputs = None
+        self._input_ids = None
+        self._last_input_versions = None
+        self._compiled = None
+        self._truth_table = None
         if self.components:
             if isinstance(self.components, (list, tuple)):
                 self._components = ComponentList(
@@ -134,8 +344,11 @@ class ComponentBase:
     @name.setter
     def name(self, name: str):
         if name is None:
-            name = f"{self.__class__.__name__}"
+            name = self._display_name
         self._name = name
+        # Constant part of __str__, cached so per-tick logging does not
+        # rebuild it.
+        self._str_prefix = f"{name}: ("
 
     @property
     def inputs(self):
@@ -146,6 +359,18 @@ class ComponentBase:
         if isinstance(inputs, list):
             inputs = NodeList(inputs)
         self._inputs = inputs
+        # Frozen copies built once per wiring change: a plain tuple for fast
+        # C-level iteration/indexing (NodeList.__getitem__ is overridden and
+        # slow) and an id array so calculate() can index the arena directly.
+        self._input_tuple = tuple(inputs) if inputs else None
+        self._input_ids = (
+            np.fromiter((n.id for n in inputs), dtype=np.int32, count=len(inputs))
+            if inputs
+            else None
+        )
+        self._last_input_versions = None
+        self._compiled = None
+        self._truth_table = None
 
     def get_components(self) -> Union[List, Tuple]:
         """
@@ -166,125 +391,276 @@ class ComponentBase:
             c.calculate()
         return self.outputs
 
+    def compile(self, kernel: bool = False):
+        """
+        Fuse this component's primitive-gate cone into a single callable with
+        no per-gate Python method dispatch. The default executes the tuple
+        program from compile_program(); kernel=True runs the flat-array plan
+        through evaluate_circuit_jit instead, which numba compiles to native
+        code when it is installed - the no-toolchain alternative to shipping
+        a C extension. Graphs with feedback cannot be topologically ordered;
+        the interpreter path isolates the feedback SCCs with
+        compile_segments() and settles only those to a fixpoint, while the
+        kernel path re-runs its whole plan (bounded) until the outputs stop
+        changing. Compiled functions are cached per mode and invalidated
+        whenever inputs are rewired.
+        """
+        if self._compiled is None:
+            self._compiled = {}
+        cached = self._compiled.get(kernel)
+        if cached is not None:
+            return cached
+        outputs = self._outputs
+        # Fold constant-input gates and drop gates that cannot reach this
+        # component's outputs, so the serialized plan only contains gates
+        # that can actually change per tick.
+        circuit = Circuit(self).initialize(outputs=list(outputs))
+        try:
+            circuit._build_layers()
+            cyclic = False
+        except graphlib.CycleError:
+            cyclic = True
+        if kernel:
+            plan = compile_circuit(circuit)
+            output_ids = plan[3]
+
+            def run(states):
+                evaluate_circuit_jit(*plan, states)
+
+            if cyclic:
+
+                def tick():
+                    states = arena.states
+                    for _ in range(4):
+                        before = states[output_ids].copy()
+                        run(states)
+                        if np.array_equal(states[output_ids], before):
+                            break
+                    return outputs
+
+            else:
+
+                def tick():
+                    run(arena.states)
+                    return outputs
+
+        elif cyclic:
+            # Only the gates on a feedback SCC are settled to a fixpoint;
+            # the acyclic remainder of the circuit still runs exactly once.
+            segments = compile_segments(circuit)
+
+            def tick():
+                states = arena.states
+                for program, loop_ids in segments:
+                    if loop_ids is None:
+                        run_program(program, states)
+                        continue
+                    for _ in range(4):
+                        before = states[loop_ids].copy()
+                        run_program(program, states)
+                        if np.array_equal(states[loop_ids], before):
+                            break
+                return outputs
+
+        else:
+            program = compile_program(circuit)
+
+            def tick():
+                run_program(program, arena.states)
+                return outputs
+
+        self._compiled[kernel] = tick
+        return tick
+
 
 class OneOutputComponent(ComponentBase):
+    __slots__ = ()
+
     def __init__(self, inputs: Union[NodeList, list] = None, name: str = None):
         super().__init__(inputs, name)
         out_name = f"{name}_out" if name else None
         if not self.outputs:
             self._outputs = [Node(name=out_name)]
 
+    def calculate(self):
+        # Early-exit when no fanin state has changed since the last
+        # evaluation, so repeated whole-circuit calculate() calls only pay for
+        # the cone of nodes that actually moved.
+        versions = arena.versions[self._input_ids]
+        if self._last_input_versions is not None and np.array_equal(
+            versions, self._last_input_versions
+        ):
+            return self._outputs
+        self._last_input_versions = versions
+        if self._truth_table is not None:
+            states = arena.states
+            idx = 0
+            for bit, node in enumerate(self._input_tuple):
+                if states[node.id] >= 1:
+                    idx |= 1 << bit
+            self.outputs[0].state = self._truth_table[idx]
+            return self._outputs
+        return self._calculate()
+
+    def use_truth_table(self) -> np.ndarray:
+        """
+        Collapse this component's evaluation to a single table lookup. The
+        table is built once by running the normal evaluation path under every
+        input assignment, so it is only valid for combinational components;
+        inputs are treated as binary (z counts as high). The table is dropped
+        automatically if the component is rewired.
+        """
+        inputs = self._input_tuple
+        fan_in = len(inputs)
+        saved = [node.state for node in inputs]
+        table = np.zeros(2**fan_in, dtype=np.uint8)
+        for idx in range(2**fan_in):
+            for bit, node in enumerate(inputs):
+                node.state = (idx >> bit) & 1
+            self._last_input_versions = None
+            table[idx] = self._calculate()[0].state
+        for node, state in zip(inputs, saved):
+            node.state = state
+        self._last_input_versions = None
+        self._calculate()
+        self._truth_table = table
+        return table
+
+    def _calculate(self):
+        return super().calculate()
+
     def __str__(self):
-        return f'{self.name}: ({", ".join([str(i) for i in self.inputs])}) -> ({str(self.outputs[0])})'
+        return f'{self._str_prefix}{", ".join(map(str, self.inputs))}) -> ({self.outputs[0]})'
 
 
 class MinTwoInputOneOutputComponent(OneOutputComponent):
+    __slots__ = ()
+
     @OneOutputComponent.inputs.setter
     def inputs(self, inputs: Union[NodeList, list]):
         if inputs and len(inputs) < 2:
-            raise ValueError(f"{self.__class__.__name__} must have two or more inputs.")
+            raise ValueError(f"{self._display_name} must have two or more inputs.")
         ComponentBase.inputs.fset(self, inputs)
 
 
 class MultipleOutputComponent(ComponentBase):
+    __slots__ = ()
+
     def __str__(self):
         return (
-            f'{self.name}: ({", ".join([str(i) for i in self.inputs])}) -> '
-            f'({", ".join([str(i) for i in self.outputs])})'
+            f'{self._str_prefix}{", ".join(map(str, self.inputs))}) -> '
+            f'({", ".join(map(str, self.outputs))})'
         )
 
 
 class OrGate(MinTwoInputOneOutputComponent):
-    def calculate(self):
-        self.outputs[0].state = (
-            State.high
-            if any(i.state >= State.high for i in self.inputs)
-            else State.low
-        )
+    __slots__ = ()
+
+    def _calculate(self):
+        ids = self._input_ids
+        if len(ids) == 2:
+            # Specialized 2-input form: two scalar reads, no reduction.
+            states = arena.states
+            self.outputs[0].state = states[ids[0]] >= 1 or states[ids[1]] >= 1
+        else:
+            # max() avoids materialising the temporary boolean array that
+            # (states >= 1).any() would allocate per call.
+            self.outputs[0].state = arena.states[ids].max() >= 1
         return self.outputs
 
 
 class AndGate(MinTwoInputOneOutputComponent):
-    def calculate(self):
-        self.outputs[0].state = (
-            State.high
-            if all(i.state >= State.high for i in self.inputs)
-            else State.low
-        )
+    __slots__ = ()
+
+    def _calculate(self):
+        ids = self._input_ids
+        if len(ids) == 2:
+            states = arena.states
+            self.outputs[0].state = states[ids[0]] >= 1 and states[ids[1]] >= 1
+        else:
+            self.outputs[0].state = arena.states[ids].min() >= 1
         return self.outputs
 
 
 class NotGate(OneOutputComponent):
+    __slots__ = ()
+
     @OneOutputComponent.inputs.setter
     def inputs(self, inputs: Union[NodeList, list]):
         if len(inputs) != 1:
             raise ValueError("A not gate can only have one input.")
         OneOutputComponent.inputs.fset(self, inputs)
 
-    def calculate(self):
-        self.outputs[0].state = (
-            State.high if self.inputs[0] == State.low else State.low
-        )
+    def _calculate(self):
+        self.outputs[0].state = 1 if self._input_tuple[0].state == 0 else 0
         return self.outputs
 
 
 class NorGate(MinTwoInputOneOutputComponent):
-    components = (OrGate, NotGate)
+    __slots__ = ()
 
-    def __init__(self, inputs: Union[NodeList, list] = None, name: str = None):
-        super().__init__(inputs, name)
-        self._outputs = self._components["NotGate"].outputs
-
-    @MinTwoInputOneOutputComponent.inputs.setter
-    def inputs(self, inputs: Union[NodeList, list]):
-        MinTwoInputOneOutputComponent.inputs.fset(self, inputs)
-        or_gate = self._components["OrGate"]
-        not_gate = self._components["NotGate"]
-        or_gate.inputs = inputs
-        not_gate.inputs = or_gate.outputs
+    def _calculate(self):
+        ids = self._input_ids
+        if len(ids) == 2:
+            states = arena.states
+            self.outputs[0].state = not (states[ids[0]] >= 1 or states[ids[1]] >= 1)
+        else:
+            self.outputs[0].state = arena.states[ids].max() < 1
+        return self.outputs
 
 
 class NandGate(MinTwoInputOneOutputComponent):
-    components = (AndGate, NotGate)
+    __slots__ = ()
 
-    def __init__(self, inputs: Union[NodeList, list] = None, name: str = None):
-        super().__init__(inputs, name)
-        self._outputs = self._components["NotGate"].outputs
-
-    @MinTwoInputOneOutputComponent.inputs.setter
-    def inputs(self, inputs: Union[NodeList, list]):
-        MinTwoInputOneOutputComponent.inputs.fset(self, inputs)
-        and_gate = self._components["AndGate"]
-        not_gate = self._components["NotGate"]
-        and_gate.inputs = inputs
-        not_gate.inputs = and_gate.outputs
+    def _calculate(self):
+        ids = self._input_ids
+        if len(ids) == 2:
+            states = arena.states
+            self.outputs[0].state = not (states[ids[0]] >= 1 and states[ids[1]] >= 1)
+        else:
+            self.outputs[0].state = arena.states[ids].min() < 1
+        return self.outputs
 
 
 class XorGate(MinTwoInputOneOutputComponent):
-    def calculate(self):
-        converted_inputs = [i.state >= State.high for i in self.inputs]
-        result = Counter(converted_inputs)
-        self.outputs[0].state = State.high if result.get(True) == 1 else State.low
+    __slots__ = ()
+
+    def _calculate(self):
+        ids = self._input_ids
+        if len(ids) == 2:
+            # The overwhelmingly common case: a straight bitwise xor of the
+            # two input states with no reduction.
+            states = arena.states
+            self.outputs[0].state = (states[ids[0]] >= 1) ^ (states[ids[1]] >= 1)
+        else:
+            # count_nonzero skips the temporary boolean array a >= 1
+            # comparison would allocate; any non-zero state counts as high.
+            self.outputs[0].state = np.count_nonzero(arena.states[ids]) == 1
         return self.outputs
 
 
 class XnorGate(MinTwoInputOneOutputComponent):
-    components = (XorGate, NotGate)
+    __slots__ = ()
 
-    def __init__(self, inputs: Union[NodeList, list] = None, name: str = None):
-        super().__init__(inputs, name)
-        self._outputs = self._components["NotGate"].outputs
+    def _calculate(self):
+        ids = self._input_ids
+        if len(ids) == 2:
+            states = arena.states
+            self.outputs[0].state = (states[ids[0]] >= 1) == (states[ids[1]] >= 1)
+        else:
+            self.outputs[0].state = np.count_nonzero(arena.states[ids]) != 1
+        return self.outputs
 
-    @MinTwoInputOneOutputComponent.inputs.setter
-    def inputs(self, inputs: Union[NodeList, list]):
-        MinTwoInputOneOutputComponent.inputs.fset(self, inputs)
-        xor_gate = self._components["XorGate"]
-        not_gate = self._components["NotGate"]
-        xor_gate.inputs = inputs
-        not_gate.inputs = xor_gate.outputs
+
+# Next (Q, QBar) for the SR latches keyed by (set << 1) | reset; None marks
+# the hold entry, which leaves the previous outputs in place.
+_SR_NOR_TABLE = (None, (0, 1), (1, 0), (0, 0))
+_SR_NAND_TABLE = ((1, 1), (1, 0), (0, 1), None)
 
 
 class SRNorLatch(MultipleOutputComponent):
+    __slots__ = ("_set_node", "_reset_node")
+
     def __init__(self, inputs: Union[NodeList, list] = None, name: str = None):
         super().__init__(inputs, name)
         self._outputs = NodeList([i.outputs[0] for i in self._components])
@@ -301,22 +677,50 @@ class SRNorLatch(MultipleOutputComponent):
         )
 
         MinTwoInputOneOutputComponent.inputs.fset(self, inputs)
+        self._set_node = inputs.get_object_by_name("Set")
+        self._reset_node = inputs.get_object_by_name("Reset")
         nor_gate1 = self._components["NorGate1"]
         nor_gate2 = self._components["NorGate2"]
-        nor_gate1.inputs = [inputs.get_object_by_name("Reset"), nor_gate2.outputs[0]]
-        nor_gate2.inputs = [inputs.get_object_by_name("Set"), nor_gate1.outputs[0]]
+        nor_gate1.inputs = [self._reset_node, nor_gate2.outputs[0]]
+        nor_gate2.inputs = [self._set_node, nor_gate1.outputs[0]]
         nor_gate1.outputs[0].name = f"Q"
         nor_gate2.outputs[0].name = f"QBar"
         self._outputs = NodeList([nor_gate1.outputs[0], nor_gate2.outputs[0]])
 
     def calculate(self):
-        self._components["NorGate1"].calculate()
-        self._components["NorGate2"].calculate()
-        self._components["NorGate1"].calculate()
+        # Branchless next-state lookup instead of iterating the cross-coupled
+        # gates; only a degenerate power-on hold (Q == QBar) still needs the
+        # gate-level fixpoint to resolve.
+        idx = (2 if self._set_node.state >= 1 else 0) | (
+            1 if self._reset_node.state >= 1 else 0
+        )
+        next_states = _SR_NOR_TABLE[idx]
+        q, qbar = self.outputs
+        if next_states is None:
+            if q.state == qbar.state:
+                return self._settle()
+            return self.outputs
+        q.state, qbar.state = next_states
+        return self.outputs
+
+    def _settle(self):
+        gate1 = self._components["NorGate1"]
+        gate2 = self._components["NorGate2"]
+        q, qbar = self.outputs
+        # Iterate to a fixpoint instead of the hardcoded extra pass; a stable
+        # latch exits after a single sweep.
+        for _ in range(4):
+            before = (q.state, qbar.state)
+            gate1.calculate()
+            gate2.calculate()
+            if (q.state, qbar.state) == before:
+                break
         return self.outputs
 
 
 class SRNandLatch(MultipleOutputComponent):
+    __slots__ = ("_set_node", "_reset_node")
+
     def __init__(self, inputs: Union[NodeList, list] = None, name: str = None):
         super().__init__(inputs, name)
         self._outputs = NodeList([i.outputs[0] for i in self._components])
@@ -333,22 +737,46 @@ class SRNandLatch(MultipleOutputComponent):
         )
 
         MinTwoInputOneOutputComponent.inputs.fset(self, inputs)
+        self._set_node = inputs.get_object_by_name("Set")
+        self._reset_node = inputs.get_object_by_name("Reset")
         gate1 = self._components["NandGate1"]
         gate2 = self._components["NandGate2"]
-        gate1.inputs = [inputs.get_object_by_name("Set"), gate2.outputs[0]]
-        gate2.inputs = [inputs.get_object_by_name("Reset"), gate1.outputs[0]]
+        gate1.inputs = [self._set_node, gate2.outputs[0]]
+        gate2.inputs = [self._reset_node, gate1.outputs[0]]
         gate1.outputs[0].name = f"Q"
         gate2.outputs[0].name = f"QBar"
         self._outputs = NodeList([gate1.outputs[0], gate2.outputs[0]])
 
     def calculate(self):
-        self._components["NandGate1"].calculate()
-        self._components["NandGate2"].calculate()
-        self._components["NandGate1"].calculate()
+        # Same lookup-table scheme as SRNorLatch, with the active-low table.
+        idx = (2 if self._set_node.state >= 1 else 0) | (
+            1 if self._reset_node.state >= 1 else 0
+        )
+        next_states = _SR_NAND_TABLE[idx]
+        q, qbar = self.outputs
+        if next_states is None:
+            if q.state == qbar.state:
+                return self._settle()
+            return self.outputs
+        q.state, qbar.state = next_states
+        return self.outputs
+
+    def _settle(self):
+        gate1 = self._components["NandGate1"]
+        gate2 = self._components["NandGate2"]
+        q, qbar = self.outputs
+        for _ in range(4):
+            before = (q.state, qbar.state)
+            gate1.calculate()
+            gate2.calculate()
+            if (q.state, qbar.state) == before:
+                break
         return self.outputs
 
 
 class DTypeFlipFlop(MultipleOutputComponent):
+    __slots__ = ("_data_node", "_clk_node")
+
     def __init__(self, inputs: Union[NodeList, list] = None, name: str = None):
         super().__init__(inputs, name)
         self._outputs = self._components["SRNandLatch"].outputs
@@ -369,6 +797,8 @@ class DTypeFlipFlop(MultipleOutputComponent):
             self.name, expected_names=["D", "Clk"], min_length=2, max_length=2
         )
         MultipleOutputComponent.inputs.fset(self, inputs)
+        self._data_node = inputs["D"]
+        self._clk_node = inputs["Clk"]
         not_gate = self._components["NotGate"]
         not_gate.inputs = [inputs["D"]]
         nand_set = self._components["NandGate1"]
@@ -381,8 +811,25 @@ class DTypeFlipFlop(MultipleOutputComponent):
         srnand.inputs = [nand_set.outputs[0], nand_reset.outputs[0]]
         self._outputs = srnand.outputs
 
+    def calculate(self):
+        # Transparent-latch shortcut: while the clock is high Q simply
+        # follows D, and with the clock low the outputs hold, so the NAND
+        # front end never needs evaluating. Only a degenerate power-on hold
+        # (Q == QBar) still runs the full gate-level sweep.
+        q, qbar = self._outputs
+        if self._clk_node.state >= 1:
+            data = 1 if self._data_node.state >= 1 else 0
+            q.state = data
+            qbar.state = 1 - data
+            return self._outputs
+        if q.state == qbar.state:
+            return super().calculate()
+        return self._outputs
+
 
 class JKFlipFlop(MultipleOutputComponent):
+    __slots__ = ()
+
     def __init__(self, inputs: Union[NodeList, list] = None, name: str = None):
         super().__init__(inputs, name)
         self._outputs = self._components["SRNandLatch"].outputs
@@ -399,20 +846,649 @@ class JKFlipFlop(MultipleOutputComponent):
         if isinstance(inputs, list):
             inputs = NodeList(inputs)
         inputs.validate(
-            self.name, expected_names=["J", "K", "Clk"], min_length=2, max_length=2
+            self.name, expected_names=["J", "K", "Clk"], min_length=3, max_length=3
         )
         MultipleOutputComponent.inputs.fset(self, inputs)
         srnand = self._components["SRNandLatch"]
+        # The latch's outputs are only named Q/QBar once its own inputs are
+        # wired below, so grab the feedback nodes positionally and hold on
+        # to them rather than looking names up per tick.
+        q = srnand._components["NandGate1"].outputs[0]
+        qbar = srnand._components["NandGate2"].outputs[0]
         nand_set = self._components["NandGate1"]
-        nand_set.inputs = [inputs["J"], inputs["Clk"], srnand.outputs["Qbar"]]
+        nand_set.inputs = [inputs["J"], inputs["Clk"], qbar]
         nand_set.outputs[0].name = "Set"
         nand_reset = self._components["NandGate2"]
-        nand_reset.inputs = [inputs["K"], inputs["Clk"], srnand.outputs["Q"]]
+        nand_reset.inputs = [inputs["K"], inputs["Clk"], q]
         nand_reset.outputs[0].name = "Reset"
         srnand.inputs = [nand_set.outputs[0], nand_reset.outputs[0]]
         self._outputs = srnand.outputs
 
 
+class Circuit:
+    """
+    Event-driven scheduler over a set of components. Instead of recursively
+    calling calculate() on every sub-component in declaration order, the
+    circuit flattens the component tree to its primitive gates once, builds a
+    node -> fanout-gates map, and on each step() only evaluates gates whose
+    input nodes actually changed, propagating to a fixpoint. This settles
+    feedback loops (e.g. SR latches) in the minimum number of passes and is
+    preferred over MultipleOutputComponent.calculate for large circuits.
+    """
+
+    def __init__(self, components: Union["ComponentBase", Iterable]):
+        if isinstance(components, ComponentBase):
+            components = [components]
+        self._gates = []
+        for component in components:
+            self._collect_gates(component)
+        self._fanout = {}
+        for gate in self._gates:
+            for node in gate.inputs:
+                self._fanout.setdefault(node, []).append(gate)
+        # Last-seen version per node; seeded so the first step evaluates
+        # everything once.
+        self._node_versions = {node: None for node in self._fanout}
+        # Topological layers of independent gates, built lazily; None means
+        # "not built yet" and an empty list means the graph has a cycle.
+        self._layers = None
+        # Per-(layer, opcode) numpy plan for evaluate_vectorized, built
+        # lazily with the same None / empty-list convention.
+        self._vector_plan = None
+        # Flat-array kernel plan for run_jit, built on first use.
+        self._jit_plan = None
+
+    def _collect_gates(self, component):
+        if component._components:
+            for sub_component in component._components:
+                self._collect_gates(sub_component)
+        else:
+            self._gates.append(component)
+
+    def step(self, until_stable: bool = True, max_events: int = 100000):
+        """
+        Propagate pending node changes through the circuit. With
+        until_stable=True (the default) gate output changes are fed back into
+        the queue until nothing changes any more.
+        """
+        queue = deque(
+            node
+            for node, version in self._node_versions.items()
+            if node.version != version
+        )
+        events = 0
+        while queue:
+            events += 1
+            if events > max_events:
+                raise ValueError(
+                    f"Circuit did not stabilise after {max_events} events."
+                )
+            node = queue.popleft()
+            self._node_versions[node] = node.version
+            for gate in self._fanout[node]:
+                output = gate.outputs[0]
+                before = output.version
+                gate.calculate()
+                if until_stable and output.version != before and output in self._fanout:
+                    queue.append(output)
+
+    def _build_layers(self):
+        producer = {gate.outputs[0]: gate for gate in self._gates}
+        dep_map = {
+            gate: {producer[node] for node in gate.inputs if node in producer}
+            for gate in self._gates
+        }
+        sorter = graphlib.TopologicalSorter(dep_map)
+        sorter.prepare()
+        layers = []
+        while sorter.is_active():
+            ready = sorter.get_ready()
+            layers.append(list(ready))
+            sorter.done(*ready)
+        return layers
+
+    def initialize(self, outputs: Iterable = None) -> "Circuit":
+        """
+        Constant-fold and prune the circuit, returning a new Circuit holding
+        only the gates that can still change. Gates whose inputs are all
+        constant nodes are evaluated once and their output marked constant;
+        gates that cannot reach any of the declared output nodes (default:
+        the circuit's sink nodes) are dropped. Gates walk in SCC topological
+        order, so feedback cores survive intact while any constant acyclic
+        logic around them still folds.
+        """
+        producer = {gate.outputs[0]: gate for gate in self._gates}
+        dep_map = {
+            gate: {producer[node] for node in gate.inputs if node in producer}
+            for gate in self._gates
+        }
+        declaration_order = {gate: i for i, gate in enumerate(self._gates)}
+        constant_nodes = set()
+        survivors = []
+        scc_of = {}
+        for i, component in enumerate(_strongly_connected_components(dep_map)):
+            for gate in component:
+                scc_of[gate] = i
+            if len(component) > 1 or component[0] in dep_map[component[0]]:
+                survivors.extend(component)
+                continue
+            gate = component[0]
+            if all(node.is_constant or node in constant_nodes for node in gate.inputs):
+                gate.calculate()
+                gate.outputs[0].is_constant = True
+                constant_nodes.add(gate.outputs[0])
+            else:
+                survivors.append(gate)
+        survivors.sort(key=declaration_order.__getitem__)
+
+        producer = {gate.outputs[0]: gate for gate in survivors}
+        if outputs is None:
+            # A node only counts as consumed when a gate outside its
+            # producer's SCC reads it, otherwise a latch whose outputs feed
+            # only each other would never qualify as a sink.
+            consumed = {
+                node
+                for gate in survivors
+                for node in gate.inputs
+                if node in producer and scc_of[producer[node]] != scc_of[gate]
+            }
+            outputs = [
+                gate.outputs[0] for gate in survivors if gate.outputs[0] not in consumed
+            ]
+        reachable = set()
+        stack = [producer[node] for node in outputs if node in producer]
+        while stack:
+            gate = stack.pop()
+            if gate in reachable:
+                continue
+            reachable.add(gate)
+            stack.extend(producer[node] for node in gate.inputs if node in producer)
+        return Circuit([gate for gate in survivors if gate in reachable])
+
+    def evaluate_parallel(self, max_workers: int = None):
+        """
+        Evaluate the circuit layer by layer, dispatching the independent gates
+        within each topological layer to a thread pool. Circuits containing
+        feedback cycles cannot be layered and fall back to the serial step().
+        """
+        if self._layers is None:
+            try:
+                self._layers = self._build_layers()
+            except graphlib.CycleError:
+                self._layers = []
+        if not self._layers:
+            return self.step()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for layer in self._layers:
+                if len(layer) == 1:
+                    layer[0].calculate()
+                else:
+                    list(executor.map(lambda gate: gate.calculate(), layer))
+
+    def evaluate_vectorized(self):
+        """
+        Evaluate the circuit with one numpy call per (layer, opcode) group.
+        The gates within a topological layer are independent, so each
+        same-opcode group gathers its inputs with a single fancy index and
+        reduces them with one ufunc.reduceat instead of a Python-level
+        calculate() per gate. Circuits containing feedback cycles cannot be
+        layered and fall back to the serial step(). Like the compiled
+        kernels, this writes arena.states directly and does not maintain
+        node versions.
+        """
+        if self._vector_plan is None:
+            try:
+                layers = self._build_layers()
+            except graphlib.CycleError:
+                layers = []
+            plan = []
+            for layer in layers:
+                groups = {}
+                for gate in layer:
+                    groups.setdefault(GATE_OPCODES[type(gate)], []).append(gate)
+                layer_plan = []
+                for op, gates in groups.items():
+                    flat_input_ids = []
+                    offsets = np.zeros(len(gates), dtype=np.int32)
+                    for g, gate in enumerate(gates):
+                        offsets[g] = len(flat_input_ids)
+                        flat_input_ids.extend(int(i) for i in gate._input_ids)
+                    output_ids = np.fromiter(
+                        (gate.outputs[0].id for gate in gates),
+                        dtype=np.int32,
+                        count=len(gates),
+                    )
+                    layer_plan.append(
+                        (
+                            op,
+                            output_ids,
+                            np.array(flat_input_ids, dtype=np.int32),
+                            offsets,
+                        )
+                    )
+                plan.append(layer_plan)
+            self._vector_plan = plan
+        if not self._vector_plan:
+            return self.step()
+        states = arena.states
+        for layer_plan in self._vector_plan:
+            for op, output_ids, input_ids, offsets in layer_plan:
+                values = states[input_ids]
+                if op == OP_NOT:
+                    result = values == 0
+                elif op == OP_AND or op == OP_NAND:
+                    result = np.minimum.reduceat(values, offsets) >= 1
+                    if op == OP_NAND:
+                        result = ~result
+                elif op == OP_OR or op == OP_NOR:
+                    result = np.maximum.reduceat(values, offsets) >= 1
+                    if op == OP_NOR:
+                        result = ~result
+                else:
+                    high = (values >= 1).astype(np.int32)
+                    result = np.add.reduceat(high, offsets) == 1
+                    if op == OP_XNOR:
+                        result = ~result
+                states[output_ids] = result
+
+    def run_jit(self):
+        """
+        Evaluate the whole circuit with a single call into the flat-array
+        kernel (numba-compiled when numba is installed), caching the
+        compiled plan on first use. Feedback gates sit at the end of the
+        plan in declaration order, so cyclic circuits may need more than
+        one call to settle. Like the other compiled paths this writes
+        arena.states directly and does not maintain node versions.
+        """
+        if self._jit_plan is None:
+            self._jit_plan = compile_circuit(self)
+        evaluate_circuit_jit(*self._jit_plan, arena.states)
+
+
+# Integer opcodes for the primitive gates, used by the compiled kernel below.
+OP_AND = 0
+OP_OR = 1
+OP_NOT = 2
+OP_XOR = 3
+OP_NOR = 4
+OP_NAND = 5
+OP_XNOR = 6
+
+# Shared gate -> opcode mapping so every compilation path (flat kernel,
+# tuple program, SCC segments) serializes gates identically.
+GATE_OPCODES = {
+    AndGate: OP_AND,
+    OrGate: OP_OR,
+    NotGate: OP_NOT,
+    XorGate: OP_XOR,
+    NorGate: OP_NOR,
+    NandGate: OP_NAND,
+    XnorGate: OP_XNOR,
+}
+
+
+def compile_circuit(components):
+    """
+    Serialize the primitive gates of a circuit in topological order into flat
+    int32 arrays suitable for evaluate_circuit_jit: per-gate opcodes, a
+    CSR-style (input_offsets, input_ids) pair and output node ids. Gates that
+    sit on a feedback cycle (latches) are appended in declaration order; run
+    the kernel repeatedly if such a circuit needs to settle.
+
+    Note the kernel writes arena.states directly and does not maintain node
+    versions, so treat it as a bulk alternative to Circuit.step() rather than
+    something to interleave with the memoized calculate() path.
+    """
+    circuit = components if isinstance(components, Circuit) else Circuit(components)
+    gates = circuit._gates
+    opcodes = GATE_OPCODES
+
+    producer = {gate.outputs[0]: gate for gate in gates}
+    consumers = {gate: [] for gate in gates}
+    in_degree = {gate: 0 for gate in gates}
+    for gate in gates:
+        for node in gate.inputs:
+            if node in producer:
+                consumers[producer[node]].append(gate)
+                in_degree[gate] += 1
+
+    ordered = []
+    ready = deque(gate for gate in gates if in_degree[gate] == 0)
+    while ready:
+        gate = ready.popleft()
+        ordered.append(gate)
+        for consumer in consumers[gate]:
+            in_degree[consumer] -= 1
+            if in_degree[consumer] == 0:
+                ready.append(consumer)
+    # Any gates left over are part of a feedback cycle.
+    ordered.extend(gate for gate in gates if in_degree[gate] > 0)
+
+    op_codes = np.fromiter(
+        (opcodes[type(gate)] for gate in ordered), dtype=np.int32, count=len(ordered)
+    )
+    input_offsets = np.zeros(len(ordered) + 1, dtype=np.int32)
+    flat_input_ids = []
+    for g, gate in enumerate(ordered):
+        flat_input_ids.extend(int(i) for i in gate._input_ids)
+        input_offsets[g + 1] = len(flat_input_ids)
+    input_ids = np.array(flat_input_ids, dtype=np.int32)
+    output_ids = np.fromiter(
+        (gate.outputs[0].id for gate in ordered), dtype=np.int32, count=len(ordered)
+    )
+    return op_codes, input_offsets, input_ids, output_ids
+
+
+def _and_op(states, ids):
+    return 1 if all(states[i] >= 1 for i in ids) else 0
+
+
+def _or_op(states, ids):
+    return 1 if any(states[i] >= 1 for i in ids) else 0
+
+
+def _not_op(states, ids):
+    return 1 if states[ids[0]] == 0 else 0
+
+
+def _xor_op(states, ids):
+    return 1 if sum(states[i] >= 1 for i in ids) == 1 else 0
+
+
+def _nor_op(states, ids):
+    return 0 if any(states[i] >= 1 for i in ids) else 1
+
+
+def _nand_op(states, ids):
+    return 0 if all(states[i] >= 1 for i in ids) else 1
+
+
+def _xnor_op(states, ids):
+    return 0 if sum(states[i] >= 1 for i in ids) == 1 else 1
+
+
+OP_TABLE = {
+    OP_AND: _and_op,
+    OP_OR: _or_op,
+    OP_NOT: _not_op,
+    OP_XOR: _xor_op,
+    OP_NOR: _nor_op,
+    OP_NAND: _nand_op,
+    OP_XNOR: _xnor_op,
+}
+
+
+def compile_program(components) -> List[Tuple[int, int, Tuple[int, ...]]]:
+    """
+    Flatten a circuit into a list of (opcode, output_id, input_ids) triples.
+    This is the pure-Python intermediate form between the object graph and
+    the numba kernel: run_program() interprets it with a single loop and a
+    table dispatch instead of a method call per gate.
+    """
+    op_codes, input_offsets, input_ids, output_ids = compile_circuit(components)
+    program = []
+    for g in range(len(op_codes)):
+        ins = tuple(int(i) for i in input_ids[input_offsets[g] : input_offsets[g + 1]])
+        program.append((int(op_codes[g]), int(output_ids[g]), ins))
+    return program
+
+
+def _strongly_connected_components(dep_map):
+    """
+    Iterative Tarjan over a gate -> {producer gates} dependency map. Returns
+    the strongly connected components in topological order (dependencies
+    before dependents), which is exactly the order they can be executed in.
+    """
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+    counter = 0
+    for root in dep_map:
+        if root in index:
+            continue
+        work = [(root, iter(dep_map[root]))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            gate, successors = work[-1]
+            descended = False
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = low[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(dep_map[succ])))
+                    descended = True
+                    break
+                if succ in on_stack:
+                    low[gate] = min(low[gate], index[succ])
+            if descended:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[gate])
+            if low[gate] == index[gate]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member is gate:
+                        break
+                components.append(component)
+    return components
+
+
+def compile_segments(components):
+    """
+    Partition a circuit into a topologically ordered list of
+    (program, output_ids) segments where only genuine feedback SCCs carry
+    output_ids (and so need to be settled to a fixpoint); runs of acyclic
+    gates are coalesced into straight-line segments with output_ids None
+    that execute exactly once. This keeps the settle loop confined to the
+    latch cores instead of re-running the whole circuit.
+    """
+    circuit = components if isinstance(components, Circuit) else Circuit(components)
+    gates = circuit._gates
+    producer = {gate.outputs[0]: gate for gate in gates}
+    dep_map = {
+        gate: {producer[node] for node in gate.inputs if node in producer}
+        for gate in gates
+    }
+    declaration_order = {gate: i for i, gate in enumerate(gates)}
+
+    def triple(gate):
+        return (
+            GATE_OPCODES[type(gate)],
+            gate.outputs[0].id,
+            tuple(int(i) for i in gate._input_ids),
+        )
+
+    segments = []
+    straight_line = []
+    for component in _strongly_connected_components(dep_map):
+        cyclic = len(component) > 1 or component[0] in dep_map[component[0]]
+        if not cyclic:
+            straight_line.append(triple(component[0]))
+            continue
+        if straight_line:
+            segments.append((straight_line, None))
+            straight_line = []
+        component.sort(key=declaration_order.__getitem__)
+        output_ids = np.fromiter(
+            (gate.outputs[0].id for gate in component),
+            dtype=np.int32,
+            count=len(component),
+        )
+        segments.append(([triple(gate) for gate in component], output_ids))
+    if straight_line:
+        segments.append((straight_line, None))
+    return segments
+
+
+def simulate_batch(components, input_words: dict, lanes: int = 64) -> dict:
+    """
+    Evaluate many independent input vectors at once using bit-parallel SWAR:
+    each node carries one machine word whose bit L is that node's value in
+    simulation lane L, and every gate becomes a handful of bitwise ops on
+    whole words. input_words maps input Node -> word; undriven nodes not in
+    the map broadcast their current scalar state across all lanes. Returns a
+    dict mapping each gate's output Node to its word. Combinational circuits
+    only - feedback loops are not settled lane-wise.
+    """
+    circuit = components if isinstance(components, Circuit) else Circuit(components)
+    program = compile_program(circuit)
+    full = (1 << lanes) - 1
+    words = {node.id: int(word) & full for node, word in input_words.items()}
+
+    def word_for(node_id):
+        if node_id not in words:
+            words[node_id] = full if arena.states[node_id] >= 1 else 0
+        return words[node_id]
+
+    for op, out, ins in program:
+        values = [word_for(i) for i in ins]
+        if op == OP_AND or op == OP_NAND:
+            word = full
+            for value in values:
+                word &= value
+            if op == OP_NAND:
+                word ^= full
+        elif op == OP_OR or op == OP_NOR:
+            word = 0
+            for value in values:
+                word |= value
+            if op == OP_NOR:
+                word ^= full
+        elif op == OP_NOT:
+            word = values[0] ^ full
+        else:
+            # Exactly-one-high per lane: at least one set minus at least two
+            # set. Matches the scalar XOR/XNOR semantics for any fan-in.
+            at_least_one = 0
+            at_least_two = 0
+            for value in values:
+                at_least_two |= at_least_one & value
+                at_least_one |= value
+            word = at_least_one & ~at_least_two & full
+            if op == OP_XNOR:
+                word ^= full
+        words[out] = word
+
+    return {gate.outputs[0]: words[gate.outputs[0].id] for gate in circuit._gates}
+
+
+def _codegen_expression(op: int, ins: Tuple[int, ...]) -> str:
+    highs = [f"s[{i}] >= 1" for i in ins]
+    if op == OP_AND:
+        return f"1 if {' and '.join(highs)} else 0"
+    if op == OP_OR:
+        return f"1 if {' or '.join(highs)} else 0"
+    if op == OP_NOT:
+        return f"1 if s[{ins[0]}] == 0 else 0"
+    if op == OP_NOR:
+        return f"0 if {' or '.join(highs)} else 1"
+    if op == OP_NAND:
+        return f"0 if {' and '.join(highs)} else 1"
+    if len(ins) == 2:
+        parity = f"({highs[0]}) != ({highs[1]})"
+    else:
+        parity = f"({' + '.join(f'({h})' for h in highs)}) == 1"
+    if op == OP_XOR:
+        return f"1 if {parity} else 0"
+    return f"0 if {parity} else 1"
+
+
+def compile_function(components):
+    """
+    Generate straight-line Python source specialized to the exact circuit -
+    one assignment per gate, no tuple unpacking or table dispatch - and
+    compile it with exec(). The generated source is attached to the returned
+    function as .source for inspection. Like run_program(), this writes the
+    arena state array directly and does not settle feedback loops.
+    """
+    program = compile_program(components)
+    lines = ["def _tick(s):"]
+    for op, out, ins in program:
+        lines.append(f"    s[{out}] = {_codegen_expression(op, ins)}")
+    if len(lines) == 1:
+        lines.append("    pass")
+    source = "\n".join(lines)
+    namespace = {}
+    exec(compile(source, "<compile_function>", "exec"), namespace)
+    generated = namespace["_tick"]
+
+    def tick(states=None):
+        generated(arena.states if states is None else states)
+
+    tick.source = source
+    return tick
+
+
+def run_program(program, states=None):
+    if states is None:
+        states = arena.states
+    table = OP_TABLE
+    for op, out, ins in program:
+        states[out] = table[op](states, ins)
+
+
+def _evaluate_circuit(op_codes, input_offsets, input_ids, output_ids, states):
+    for g in range(len(op_codes)):
+        op = op_codes[g]
+        start = input_offsets[g]
+        end = input_offsets[g + 1]
+        if op == OP_AND:
+            value = 1
+            for i in range(start, end):
+                if states[input_ids[i]] < 1:
+                    value = 0
+                    break
+        elif op == OP_OR:
+            value = 0
+            for i in range(start, end):
+                if states[input_ids[i]] >= 1:
+                    value = 1
+                    break
+        elif op == OP_NOT:
+            value = 1 if states[input_ids[start]] == 0 else 0
+        elif op == OP_NOR:
+            value = 1
+            for i in range(start, end):
+                if states[input_ids[i]] >= 1:
+                    value = 0
+                    break
+        elif op == OP_NAND:
+            value = 0
+            for i in range(start, end):
+                if states[input_ids[i]] < 1:
+                    value = 1
+                    break
+        else:
+            count = 0
+            for i in range(start, end):
+                if states[input_ids[i]] >= 1:
+                    count += 1
+            if op == OP_XOR:
+                value = 1 if count == 1 else 0
+            else:
+                value = 0 if count == 1 else 1
+        states[output_ids[g]] = value
+
+
+if numba is not None:
+    evaluate_circuit_jit = numba.njit(cache=True, nogil=True)(_evaluate_circuit)
+else:
+    # Numba is optional; fall back to the plain-Python loop.
+    evaluate_circuit_jit = _evaluate_circuit
+
+
 def main():
     s = Node(State.low, name="S")
     r = Node(State.high, name="R")
@@ -1,3 +1,4 @@
+import itertools
 from typing import Tuple, List, Union
 
 import pytest
@@ -15,6 +16,8 @@ from emulate import (
     SRNorLatch,
     SRNandLatch,
     DTypeFlipFlop,
+    JKFlipFlop,
+    Circuit,
     ComponentBase,
     ComponentList,
     OneOutputComponent,
@@ -27,10 +30,13 @@ class TestState:
         a = Node(state=State.high)
         assert a == State.high
 
-    def test_comparing_anything_else_fails(self):
-        with pytest.raises(ValueError) as ex:
-            assert OrGate() == State.low
-        assert str(ex.value) == "Cannot compare OrGate class with a State class."
+    def test_comparing_nodes_with_ints(self):
+        a = Node(state=State.high)
+        assert a == 1
+        assert a != 0
+
+    def test_comparing_anything_else_is_false(self):
+        assert (OrGate() == State.low) is False
 
 
 class TestNode:
@@ -39,6 +45,99 @@ class TestNode:
         assert str(a) == f"hello world: State.high"
 
 
+class TestNodeArena:
+    def test_arena_grows_past_capacity(self):
+        from emulate import NodeArena
+
+        small = NodeArena(capacity=2)
+        ids = [small.new_id(1) for _ in range(5)]
+        assert ids == [0, 1, 2, 3, 4]
+        assert all(small.states[i] == 1 for i in ids)
+
+    def test_batch_allocation_is_contiguous(self):
+        from emulate import NodeArena
+
+        small = NodeArena(capacity=2)
+        assert small.allocate(5) == range(0, 5)
+        assert small.allocate(3) == range(5, 8)
+        assert len(small.states) >= 8
+
+    def test_shared_constant_nodes(self):
+        from emulate import CONST_HIGH, CONST_LOW
+
+        assert CONST_LOW.id == 0
+        assert CONST_HIGH.id == 1
+        assert CONST_LOW == State.low
+        assert CONST_HIGH == State.high
+        with pytest.raises(ValueError):
+            CONST_HIGH.state = State.low
+
+    def test_constant_tie_off_folds_at_compile_time(self):
+        from emulate import CONST_HIGH, CONST_LOW
+
+        live = Node(State.low)
+        gate = AndGate([CONST_HIGH, CONST_LOW])
+        or_gate = OrGate([live, gate.outputs[0]])
+        circuit = Circuit([gate, or_gate]).initialize(outputs=[or_gate.outputs[0]])
+        # The fully tied-off AND folded away; only the OR survives.
+        assert circuit._gates == [or_gate]
+        assert gate.outputs[0] == State.low
+        assert gate.outputs[0].is_constant
+
+    def test_reset_reissues_ids(self):
+        from emulate import NodeArena
+
+        small = NodeArena(capacity=2)
+        small.new_id(1)
+        small.reset()
+        assert small.new_id(0) == 0
+        assert small.states[0] == 0
+
+
+class TestMemoization:
+    def test_version_only_bumps_on_change(self):
+        a = Node(State.low)
+        assert a.version == 0
+        a.state = State.low
+        assert a.version == 0
+        a.state = State.high
+        assert a.version == 1
+
+    def test_gate_skips_recalculation_when_inputs_unchanged(self):
+        calls = []
+
+        class CountingOrGate(OrGate):
+            def _calculate(self):
+                calls.append(1)
+                return super()._calculate()
+
+        a = Node(State.low)
+        b = Node(State.high)
+        gate = CountingOrGate([a, b])
+        gate.calculate()
+        gate.calculate()
+        assert len(calls) == 1
+
+        a.state = State.high
+        gate.calculate()
+        assert len(calls) == 2
+
+
+class TestNodeHashing:
+    def test_nodes_hash_by_identity(self):
+        """
+        The Circuit fanout map keys on Node instances, so two nodes with equal
+        states must still occupy distinct dict slots.
+        """
+        a = Node(State.high)
+        b = Node(State.high)
+        assert a.state == b.state
+        fanout = {a: "gate1", b: "gate2"}
+        assert len(fanout) == 2
+        assert fanout[a] == "gate1"
+        assert fanout[b] == "gate2"
+
+
 class TestNodeList:
     def test_validation_minimum_success(self):
         nodes = NodeList([Node(name="1"), Node(name="2")])
@@ -103,6 +202,35 @@ class TestNodeList:
             nodes.get_object_by_name("Set")
         assert str(ex.value) == f"Node Set not found. Valid node names are (set, 2, 3)"
 
+    def test_get_object_by_name_sees_replacements(self):
+        node1 = Node(name="a")
+        node2 = Node(name="a")
+        nodes = NodeList([node1])
+        assert nodes.get_object_by_name("a") == node1
+        nodes[0] = node2
+        assert nodes.get_object_by_name("a") == node2
+
+    def test_get_object_by_name_sees_renames(self):
+        node1 = Node(name="old")
+        nodes = NodeList([node1])
+        assert nodes.get_object_by_name("old") == node1
+        node1.name = "new"
+        assert nodes.get_object_by_name("new") == node1
+        with pytest.raises(ValueError):
+            nodes.get_object_by_name("old")
+
+    def test_get_object_by_name_sees_removals(self):
+        node1 = Node(name="a")
+        node2 = Node(name="b")
+        nodes = NodeList([node1, node2])
+        assert nodes.get_object_by_name("b") == node2
+        nodes.pop()
+        with pytest.raises(ValueError):
+            nodes.get_object_by_name("b")
+        del nodes[0]
+        with pytest.raises(ValueError):
+            nodes.get_object_by_name("a")
+
     def test_str(self):
         a = NodeList([Node(name="node", state=State.high)])
         assert str(a) == "[node: State.high]"
@@ -200,144 +328,119 @@ class TwoInputMixin:
             str(ex.value) == f"{self.component.__name__} must have two or more inputs."
         )
 
+    def test_calculate_reuses_the_output_node(self):
+        """
+        Recalculating must never allocate a fresh output Node; downstream
+        components hold a reference to the original.
+        """
+        a = Node(State.high)
+        c = self.component([a, Node(State.high)])
+        out = c.calculate()[0]
+        a.state = State.low
+        assert c.calculate()[0] is out
+
 
 class TestOrGate(TwoInputMixin):
     component = OrGate
 
-    @pytest.mark.parametrize(
-        "ina, inb, inc, result",
-        (
-            (State.high, State.high, State.high, State.high),
-            (State.high, State.high, State.low, State.high),
-            (State.high, State.low, State.high, State.high),
-            (State.high, State.low, State.low, State.high),
-            (State.low, State.high, State.high, State.high),
-            (State.low, State.high, State.low, State.high),
-            (State.low, State.low, State.high, State.high),
-            (State.low, State.low, State.low, State.low),
-        ),
-    )
-    def test_gate(self, ina, inb, inc, result):
-        c = self.component([Node(ina), Node(inb), Node(inc)])
-        assert c.calculate()[0].state == result
-        assert c.outputs[0].state == result
-
 
 class TestNorGate(TwoInputMixin):
     component = NorGate
 
-    @pytest.mark.parametrize(
-        "ina, inb, inc, result",
-        (
-            (State.high, State.high, State.high, State.low),
-            (State.high, State.high, State.low, State.low),
-            (State.high, State.low, State.high, State.low),
-            (State.high, State.low, State.low, State.low),
-            (State.low, State.high, State.high, State.low),
-            (State.low, State.high, State.low, State.low),
-            (State.low, State.low, State.high, State.low),
-            (State.low, State.low, State.low, State.high),
-        ),
-    )
-    def test_nor_gate(self, ina, inb, inc, result):
-        c = self.component([Node(ina), Node(inb), Node(inc)])
-        assert c.calculate()[0].state == result
-        assert c.outputs[0].state == result
-
 
 class TestAndGate(TwoInputMixin):
     component = AndGate
 
-    @pytest.mark.parametrize(
-        "ina, inb, inc, result",
-        (
-            (State.high, State.high, State.high, State.high),
-            (State.high, State.high, State.low, State.low),
-            (State.high, State.low, State.high, State.low),
-            (State.high, State.low, State.low, State.low),
-            (State.low, State.high, State.high, State.low),
-            (State.low, State.high, State.low, State.low),
-            (State.low, State.low, State.high, State.low),
-            (State.low, State.low, State.low, State.low),
-        ),
-    )
-    def test_and_gate(self, ina, inb, inc, result):
-        c = self.component([Node(ina), Node(inb), Node(inc)])
-        assert c.calculate()[0].state == result
-        assert c.outputs[0].state == result
-
 
 class TestNandGate(TwoInputMixin):
     component = NandGate
 
-    @pytest.mark.parametrize(
-        "ina, inb, inc, result",
-        (
-            (State.high, State.high, State.high, State.low),
-            (State.high, State.high, State.low, State.high),
-            (State.high, State.low, State.high, State.high),
-            (State.high, State.low, State.low, State.high),
-            (State.low, State.high, State.high, State.high),
-            (State.low, State.high, State.low, State.high),
-            (State.low, State.low, State.high, State.high),
-            (State.low, State.low, State.low, State.high),
-        ),
-    )
-    def test_nand_gate(self, ina, inb, inc, result):
-        c = self.component([Node(ina), Node(inb), Node(inc)])
-        assert c.calculate()[0].state == result
-        assert c.outputs[0].state == result
-
 
 class TestXorGate(TwoInputMixin):
     component = XorGate
 
-    @pytest.mark.parametrize(
-        "ina, inb, inc, result",
-        (
-            (State.high, State.high, State.high, State.low),
-            (State.high, State.high, State.low, State.low),
-            (State.high, State.low, State.high, State.low),
-            (State.high, State.low, State.low, State.high),
-            (State.low, State.high, State.high, State.low),
-            (State.low, State.high, State.low, State.high),
-            (State.low, State.low, State.high, State.high),
-            (State.low, State.low, State.low, State.low),
-        ),
-    )
-    def test_xor_gate(self, ina, inb, inc, result):
-        c = self.component([Node(ina), Node(inb), Node(inc)])
-        assert c.calculate()[0].state == result
-        assert c.outputs[0].state == result
-
 
 class TestXnorGate(TwoInputMixin):
     component = XnorGate
 
+
+# One shared row table for every 3-input truth-table test below, generated
+# rather than hand-written so the expected columns cannot drift; State is an
+# IntEnum, so the columns fall out of plain int arithmetic on the rows.
+THREE_INPUT_ROWS = tuple(itertools.product((State.high, State.low), repeat=3))
+
+GATE_EXPECTED_COLUMNS = (
+    (OrGate, tuple(a | b | c for a, b, c in THREE_INPUT_ROWS)),
+    (NorGate, tuple((a | b | c) ^ 1 for a, b, c in THREE_INPUT_ROWS)),
+    (AndGate, tuple(a & b & c for a, b, c in THREE_INPUT_ROWS)),
+    (NandGate, tuple((a & b & c) ^ 1 for a, b, c in THREE_INPUT_ROWS)),
+    (XorGate, tuple(int(a + b + c == 1) for a, b, c in THREE_INPUT_ROWS)),
+    (XnorGate, tuple(int(a + b + c != 1) for a, b, c in THREE_INPUT_ROWS)),
+)
+
+
+class TestThreeInputGateTruthTables:
+    @pytest.mark.parametrize(
+        "component, expected",
+        GATE_EXPECTED_COLUMNS,
+        ids=[component.__name__ for component, _ in GATE_EXPECTED_COLUMNS],
+    )
+    def test_gate(self, component, expected):
+        # One gate and three nodes per gate class; each table row just
+        # reassigns states in place instead of paying a fresh pytest case
+        # and construction per row.
+        a = Node()
+        b = Node()
+        c = Node()
+        gate = component([a, b, c])
+        for (ina, inb, inc), result in zip(THREE_INPUT_ROWS, expected):
+            a.state = ina
+            b.state = inb
+            c.state = inc
+            assert gate.calculate()[0].state == State(result), (ina, inb, inc)
+            assert gate.outputs[0].state == State(result)
+
+
+class TestWideFanInGates:
     @pytest.mark.parametrize(
-        "ina, inb, inc, result",
+        "component, reference",
         (
-            (State.high, State.high, State.high, State.high),
-            (State.high, State.high, State.low, State.high),
-            (State.high, State.low, State.high, State.high),
-            (State.high, State.low, State.low, State.low),
-            (State.low, State.high, State.high, State.high),
-            (State.low, State.high, State.low, State.low),
-            (State.low, State.low, State.high, State.low),
-            (State.low, State.low, State.low, State.high),
+            (OrGate, lambda bits: any(bits)),
+            (NorGate, lambda bits: not any(bits)),
+            (AndGate, lambda bits: all(bits)),
+            (NandGate, lambda bits: not all(bits)),
+            (XorGate, lambda bits: sum(bits) == 1),
+            (XnorGate, lambda bits: sum(bits) != 1),
         ),
+        ids=("OrGate", "NorGate", "AndGate", "NandGate", "XorGate", "XnorGate"),
     )
-    def test_xnor_gate(self, ina, inb, inc, result):
-        c = self.component([Node(ina), Node(inb), Node(inc)])
-        assert c.calculate()[0].state == result
-        assert c.outputs[0].state == result
+    def test_exhaustive_up_to_five_inputs(self, component, reference):
+        """
+        Every input combination for fan-ins 2-5, checked against a plain
+        Python reference. This is what exercises the wide (numpy reduction)
+        paths that the 2-input scalar fast paths skip.
+        """
+        for fan_in in range(2, 6):
+            nodes = [Node() for _ in range(fan_in)]
+            gate = component(nodes)
+            for bits in itertools.product((0, 1), repeat=fan_in):
+                for node, bit in zip(nodes, bits):
+                    node.state = bit
+                assert gate.calculate()[0].state == State(int(reference(bits))), (
+                    fan_in,
+                    bits,
+                )
 
 
 class TestNotGate:
     component = NotGate
 
     @pytest.mark.parametrize(
-        "ina, result", ((State.low, State.high), (State.high, State.low),)
+        "ina, result",
+        (
+            (State.low, State.high),
+            (State.high, State.low),
+        ),
     )
     def test_not_gate(self, ina, result):
         a = Node(ina)
@@ -356,6 +459,362 @@ class TestNotGate:
         assert str(ex.value) == "A not gate can only have one input."
 
 
+class TestCircuit:
+    def test_settles_sr_nor_latch_feedback(self):
+        set_node = Node(State.low, name="Set")
+        reset_node = Node(State.high, name="Reset")
+        latch = SRNorLatch([set_node, reset_node])
+        circuit = Circuit(latch)
+
+        circuit.step()
+        assert latch.outputs["Q"] == State.low
+        assert latch.outputs["QBar"] == State.high
+
+        set_node.state = State.high
+        reset_node.state = State.low
+        circuit.step()
+        assert latch.outputs["Q"] == State.high
+        assert latch.outputs["QBar"] == State.low
+
+        set_node.state = State.low
+        circuit.step()
+        assert latch.outputs["Q"] == State.high
+        assert latch.outputs["QBar"] == State.low
+
+    def test_stable_step_is_a_no_op(self):
+        calls = []
+
+        class CountingAndGate(AndGate):
+            def _calculate(self):
+                calls.append(1)
+                return super()._calculate()
+
+        a = Node(State.high)
+        b = Node(State.high)
+        gate = CountingAndGate([a, b])
+        circuit = Circuit(gate)
+
+        circuit.step()
+        assert gate.outputs[0] == State.high
+        assert len(calls) == 1
+
+        circuit.step()
+        assert len(calls) == 1
+
+    def test_evaluate_parallel_layers(self):
+        a = Node(State.high)
+        b = Node(State.low)
+        gate = XnorGate([a, b])
+        circuit = Circuit(gate)
+        circuit.evaluate_parallel()
+        assert gate.outputs[0] == State.low
+
+    @pytest.mark.parametrize("ina", (State.low, State.high))
+    @pytest.mark.parametrize("inb", (State.low, State.high))
+    @pytest.mark.parametrize("inc", (State.low, State.high))
+    def test_evaluate_vectorized_matches_object_evaluation(self, ina, inb, inc):
+        a = Node(ina)
+        b = Node(inb)
+        c = Node(inc)
+        # Three independent gates in the first layer, one in the second.
+        and_gate = AndGate([a, b])
+        or_gate = OrGate([b, c])
+        xor_gate = XorGate([a, c])
+        nor_gate = NorGate([and_gate.outputs[0], xor_gate.outputs[0]])
+        not_gate = NotGate([or_gate.outputs[0]])
+
+        circuit = Circuit([and_gate, or_gate, xor_gate, nor_gate, not_gate])
+        circuit.evaluate_vectorized()
+        high_a, high_b, high_c = (i == State.high for i in (ina, inb, inc))
+        assert and_gate.outputs[0].state == int(high_a and high_b)
+        assert or_gate.outputs[0].state == int(high_b or high_c)
+        assert xor_gate.outputs[0].state == int(high_a != high_c)
+        assert nor_gate.outputs[0].state == int(
+            not ((high_a and high_b) or (high_a != high_c))
+        )
+        assert not_gate.outputs[0].state == int(not (high_b or high_c))
+
+    def test_run_jit_matches_object_evaluation(self):
+        a = Node(State.high)
+        b = Node(State.low)
+        gate = XorGate([a, b])
+        circuit = Circuit(gate)
+        circuit.run_jit()
+        assert gate.outputs[0] == State.high
+        a.state = State.low
+        circuit.run_jit()
+        assert gate.outputs[0] == State.low
+
+    def test_evaluate_vectorized_falls_back_for_feedback(self):
+        set_node = Node(State.high, name="Set")
+        reset_node = Node(State.low, name="Reset")
+        latch = SRNorLatch([set_node, reset_node])
+        circuit = Circuit(latch)
+        circuit.evaluate_vectorized()
+        assert latch.outputs["Q"] == State.high
+        assert latch.outputs["QBar"] == State.low
+
+    def test_evaluate_parallel_falls_back_for_feedback(self):
+        set_node = Node(State.high, name="Set")
+        reset_node = Node(State.low, name="Reset")
+        latch = SRNorLatch([set_node, reset_node])
+        circuit = Circuit(latch)
+        circuit.evaluate_parallel()
+        assert latch.outputs["Q"] == State.high
+        assert latch.outputs["QBar"] == State.low
+
+    def test_initialize_folds_constants_and_prunes_dead_gates(self):
+        const_a = Node(State.high, is_constant=True)
+        const_b = Node(State.high, is_constant=True)
+        live = Node(State.low)
+        and_gate = AndGate([const_a, const_b])
+        or_gate = OrGate([live, and_gate.outputs[0]])
+        dead_gate = NotGate([live])
+
+        circuit = Circuit([and_gate, or_gate, dead_gate])
+        optimized = circuit.initialize(outputs=[or_gate.outputs[0]])
+
+        # The AND over two constants was folded once and removed.
+        assert and_gate.outputs[0] == State.high
+        assert and_gate.outputs[0].is_constant
+        # The NOT gate feeds no declared output, so it was pruned too.
+        assert optimized._gates == [or_gate]
+
+        optimized.step()
+        assert or_gate.outputs[0] == State.high
+
+    def test_initialize_keeps_feedback_cores_intact(self):
+        latch = SRNorLatch(
+            [Node(State.high, name="Set"), Node(State.low, name="Reset")]
+        )
+        circuit = Circuit(latch)
+        optimized = circuit.initialize()
+        assert len(optimized._gates) == 2
+        optimized.step()
+        assert latch.outputs["Q"] == State.high
+        assert latch.outputs["QBar"] == State.low
+
+    def test_unstable_circuit_raises(self):
+        a = Node(State.low)
+        not_gate = NotGate([a])
+        # Ring oscillator: the inverter's output drives its own input.
+        not_gate.inputs = [not_gate.outputs[0]]
+        circuit = Circuit(not_gate)
+        with pytest.raises(ValueError) as ex:
+            circuit.step(max_events=10)
+        assert str(ex.value) == "Circuit did not stabilise after 10 events."
+
+
+class TestCompiledCircuit:
+    @pytest.mark.parametrize(
+        "ina, inb, result",
+        (
+            (State.high, State.high, State.high),
+            (State.high, State.low, State.low),
+            (State.low, State.high, State.low),
+            (State.low, State.low, State.high),
+        ),
+    )
+    def test_kernel_matches_object_evaluation(self, ina, inb, result):
+        from emulate import arena, compile_circuit, evaluate_circuit_jit
+
+        a = Node(ina)
+        b = Node(inb)
+        gate = XnorGate([a, b])
+        plan = compile_circuit(gate)
+        evaluate_circuit_jit(*plan, arena.states)
+        assert gate.outputs[0] == result
+        assert gate.calculate()[0] == result
+
+    def test_component_compile_fuses_combinational_cone(self):
+        a = Node(State.high)
+        b = Node(State.low)
+        gate = NandGate([a, b])
+        tick = gate.compile()
+        assert tick is gate.compile()
+        assert tick()[0] == State.high
+        a.state = State.high
+        b.state = State.high
+        assert tick()[0] == State.low
+
+    def test_component_compile_kernel_mode(self):
+        a = Node(State.high)
+        b = Node(State.low)
+        gate = NorGate([a, b])
+        tick = gate.compile(kernel=True)
+        assert tick is gate.compile(kernel=True)
+        assert tick is not gate.compile()
+        assert tick()[0] == State.low
+        a.state = State.low
+        assert tick()[0] == State.high
+
+    def test_component_compile_settles_feedback(self):
+        set_node = Node(State.low, name="Set")
+        reset_node = Node(State.high, name="Reset")
+        latch = SRNorLatch([set_node, reset_node])
+        tick = latch.compile()
+        tick()
+        assert latch.outputs["Q"] == State.low
+        assert latch.outputs["QBar"] == State.high
+
+        set_node.state = State.high
+        reset_node.state = State.low
+        tick()
+        assert latch.outputs["Q"] == State.high
+        assert latch.outputs["QBar"] == State.low
+
+    def test_compile_segments_isolates_feedback_scc(self):
+        from emulate import compile_segments
+
+        data = Node(State.high, name="D")
+        clk = Node(State.high, name="Clk")
+        flip_flop = DTypeFlipFlop([data, clk])
+        segments = compile_segments(flip_flop)
+        # The NOT/NAND front end is straight-line; only the two latch gates
+        # form a feedback SCC that needs settling.
+        cyclic = [ids for _, ids in segments if ids is not None]
+        assert len(cyclic) == 1
+        assert len(cyclic[0]) == 2
+        assert sum(len(program) for program, _ in segments) == 5
+
+        tick = flip_flop.compile()
+        tick()
+        assert flip_flop.outputs["Q"] == State.high
+        assert flip_flop.outputs["QBar"] == State.low
+        data.state = State.low
+        tick()
+        assert flip_flop.outputs["Q"] == State.low
+        assert flip_flop.outputs["QBar"] == State.high
+
+    def test_compile_folds_constant_front_end(self):
+        data = Node(State.high, is_constant=True, name="D")
+        clk = Node(State.high, is_constant=True, name="Clk")
+        flip_flop = DTypeFlipFlop([data, clk])
+        tick = flip_flop.compile()
+        # The NOT/NAND front end was folded at compile time; only the latch
+        # core remains in the plan.
+        not_gate = flip_flop._components["NotGate"]
+        assert not_gate.outputs[0].is_constant
+        tick()
+        assert flip_flop.outputs["Q"] == State.high
+        assert flip_flop.outputs["QBar"] == State.low
+
+    @pytest.mark.parametrize("ina", (State.low, State.high))
+    @pytest.mark.parametrize("inb", (State.low, State.high))
+    def test_pure_python_fallback_matches_kernel(self, ina, inb):
+        from emulate import _evaluate_circuit, arena, compile_circuit
+
+        a = Node(ina)
+        b = Node(inb)
+        gate = XnorGate([a, b])
+        plan = compile_circuit(gate)
+        # The fallback used when numba is not installed must agree with both
+        # the (possibly jitted) kernel and the object graph.
+        _evaluate_circuit(*plan, arena.states)
+        fallback_result = gate.outputs[0].state
+        from emulate import evaluate_circuit_jit
+
+        evaluate_circuit_jit(*plan, arena.states)
+        assert gate.outputs[0].state == fallback_result
+        assert gate.calculate()[0].state == fallback_result
+
+    def test_truth_table_lookup_matches_direct_evaluation(self):
+        calls = []
+
+        class CountingXorGate(XorGate):
+            def _calculate(self):
+                calls.append(1)
+                return super()._calculate()
+
+        a = Node(State.low)
+        b = Node(State.low)
+        gate = CountingXorGate([a, b])
+        gate.use_truth_table()
+        built = len(calls)
+
+        for ina, inb, result in (
+            (State.high, State.high, State.low),
+            (State.high, State.low, State.high),
+            (State.low, State.high, State.high),
+            (State.low, State.low, State.low),
+        ):
+            a.state = ina
+            b.state = inb
+            assert gate.calculate()[0] == result
+        # All post-build evaluations came from the table.
+        assert len(calls) == built
+
+    def test_simulate_batch_runs_all_lanes_at_once(self):
+        from emulate import simulate_batch
+
+        a = Node(State.low)
+        b = Node(State.low)
+        gate = XorGate([a, b])
+        # Lane L carries the Lth row of the 2-input truth table.
+        results = simulate_batch(gate, {a: 0b0101, b: 0b0011}, lanes=4)
+        assert results[gate.outputs[0]] == 0b0110
+
+    def test_simulate_batch_broadcasts_undriven_nodes(self):
+        from emulate import simulate_batch
+
+        a = Node(State.high)
+        b = Node(State.low)
+        gate = AndGate([a, b])
+        results = simulate_batch(gate, {b: 0b1010}, lanes=4)
+        assert results[gate.outputs[0]] == 0b1010
+
+    def test_generated_source_matches_object_evaluation(self):
+        from emulate import compile_function
+
+        a = Node(State.low)
+        b = Node(State.high)
+        gate = NorGate([a, b])
+        tick = compile_function(gate)
+        assert (
+            tick.source
+            == f"def _tick(s):\n    s[{gate.outputs[0].id}] = 0 if s[{a.id}] >= 1 or s[{b.id}] >= 1 else 1"
+        )
+        tick()
+        assert gate.outputs[0] == State.low
+        a.state = State.low
+        b.state = State.low
+        tick()
+        assert gate.outputs[0] == State.high
+
+    @pytest.mark.parametrize(
+        "ina, inb, result",
+        (
+            (State.high, State.high, State.low),
+            (State.high, State.low, State.high),
+            (State.low, State.high, State.high),
+            (State.low, State.low, State.low),
+        ),
+    )
+    def test_program_interpreter_matches_object_evaluation(self, ina, inb, result):
+        from emulate import compile_program, run_program
+
+        a = Node(ina)
+        b = Node(inb)
+        gate = XorGate([a, b])
+        program = compile_program(gate)
+        run_program(program)
+        assert gate.outputs[0] == result
+        assert gate.calculate()[0] == result
+
+
+# Reusable input pairs for the latch and flip-flop tests: constructing
+# Nodes is the expensive part, assigning .state is cheap, so each test
+# takes the pool and sets the states it needs.
+@pytest.fixture(scope="module")
+def sr_nodes():
+    return Node(State.low, name="Set"), Node(State.low, name="Reset")
+
+
+@pytest.fixture(scope="module")
+def dff_nodes():
+    return Node(State.low, name="D"), Node(State.low, name="Clk")
+
+
 class TestSRNorLatch:
     @pytest.mark.parametrize(
         "s, r, q, qbar",
@@ -366,8 +825,11 @@ class TestSRNorLatch:
             (State.low, State.low, State.high, State.low),  # Last state
         ),
     )
-    def test_gate(self, s, r, q, qbar):
-        latch = SRNorLatch([Node(s, name="Set"), Node(r, name="Reset")])
+    def test_gate(self, sr_nodes, s, r, q, qbar):
+        set_node, reset_node = sr_nodes
+        set_node.state = s
+        reset_node.state = r
+        latch = SRNorLatch([set_node, reset_node])
         out_nodes = latch.calculate()
         assert [i.state for i in out_nodes] == [q, qbar], latch
 
@@ -411,8 +873,11 @@ class TestSRNandLatch:
             (State.low, State.low, State.high, State.high),  # illegal state
         ),
     )
-    def test_gate(self, s, r, q, qbar):
-        latch = SRNandLatch([Node(s, name="Set"), Node(r, name="Reset")])
+    def test_gate(self, sr_nodes, s, r, q, qbar):
+        set_node, reset_node = sr_nodes
+        set_node.state = s
+        reset_node.state = r
+        latch = SRNandLatch([set_node, reset_node])
         out_nodes = latch.calculate()
         assert [i.state for i in out_nodes] == [q, qbar], latch
 
@@ -447,9 +912,10 @@ class TestSRNandLatch:
 
 
 class TestDTypeFlipFlop:
-    def test_basic(self):
-        d = Node(State.low, name="D")
-        clk = Node(State.high, name="Clk")
+    def test_basic(self, dff_nodes):
+        d, clk = dff_nodes
+        d.state = State.low
+        clk.state = State.high
         ff = DTypeFlipFlop([d, clk])
         ff.calculate()
         assert ff.outputs["Q"].state == State.low
@@ -461,9 +927,10 @@ class TestDTypeFlipFlop:
         assert ff.outputs["Q"].state == State.high
         assert ff.outputs["QBar"].state == State.low
 
-    def test_no_change_state_low_output(self):
-        d = Node(State.low, name="D")
-        clk = Node(State.high, name="Clk")
+    def test_no_change_state_low_output(self, dff_nodes):
+        d, clk = dff_nodes
+        d.state = State.low
+        clk.state = State.high
         ff = DTypeFlipFlop([d, clk])
         ff.calculate()
         assert ff.outputs["Q"].state == State.low
@@ -487,9 +954,10 @@ class TestDTypeFlipFlop:
         assert ff.outputs["Q"].state == State.low
         assert ff.outputs["QBar"].state == State.high
 
-    def test_no_change_state_high_output(self):
-        d = Node(State.high, name="D")
-        clk = Node(State.high, name="Clk")
+    def test_no_change_state_high_output(self, dff_nodes):
+        d, clk = dff_nodes
+        d.state = State.high
+        clk.state = State.high
         ff = DTypeFlipFlop([d, clk])
         ff.calculate()
         assert ff.outputs["Q"].state == State.high
@@ -512,3 +980,130 @@ class TestDTypeFlipFlop:
         ff.calculate()
         assert ff.outputs["Q"].state == State.high
         assert ff.outputs["QBar"].state == State.low
+
+
+class TestDTypeFlipFlopWaveform:
+    def test_waveform_sweep_matches_reference_model(self, dff_nodes):
+        """
+        Drive the flip-flop through a few hundred clock cycles and compare
+        the whole Q trace against a plain transparent-latch reference
+        model, instead of hand-asserting a handful of steps.
+        """
+        import numpy as np
+
+        d, clk = dff_nodes
+        cycles = 256
+        d_wave = ((np.arange(cycles) // 3) % 2).astype(np.uint8)
+        clk_wave = (np.arange(cycles) % 2 == 0).astype(np.uint8)
+
+        expected = np.empty(cycles, dtype=np.uint8)
+        state = 0
+        for i in range(cycles):
+            if clk_wave[i]:
+                state = d_wave[i]
+            expected[i] = state
+
+        d.state = int(d_wave[0])
+        clk.state = int(clk_wave[0])
+        ff = DTypeFlipFlop([d, clk])
+        got = np.empty(cycles, dtype=np.uint8)
+        for i in range(cycles):
+            d.state = int(d_wave[i])
+            clk.state = int(clk_wave[i])
+            ff.calculate()
+            got[i] = ff.outputs["Q"].state
+        assert np.array_equal(got, expected)
+
+
+class TestJKFlipFlop:
+    def test_set_and_reset(self):
+        j = Node(State.high, name="J")
+        k = Node(State.low, name="K")
+        clk = Node(State.high, name="Clk")
+        ff = JKFlipFlop([j, k, clk])
+        ff.calculate()
+        assert ff.outputs["Q"].state == State.high
+        assert ff.outputs["QBar"].state == State.low
+
+        j.state = State.low
+        k.state = State.high
+        ff.calculate()
+        assert ff.outputs["Q"].state == State.low
+        assert ff.outputs["QBar"].state == State.high
+
+    def test_no_change_when_clock_low(self):
+        j = Node(State.high, name="J")
+        k = Node(State.low, name="K")
+        clk = Node(State.high, name="Clk")
+        ff = JKFlipFlop([j, k, clk])
+        ff.calculate()
+        assert ff.outputs["Q"].state == State.high
+
+        clk.state = State.low
+        j.state = State.low
+        k.state = State.high
+        ff.calculate()
+        assert ff.outputs["Q"].state == State.high
+        assert ff.outputs["QBar"].state == State.low
+
+    def test_toggle(self):
+        j = Node(State.high, name="J")
+        k = Node(State.low, name="K")
+        clk = Node(State.high, name="Clk")
+        ff = JKFlipFlop([j, k, clk])
+        ff.calculate()
+        assert ff.outputs["Q"].state == State.high
+
+        # With J and K both high the latch toggles once per calculate()
+        # (level-triggered, so each pass acts like one clock pulse).
+        k.state = State.high
+        ff.calculate()
+        assert ff.outputs["Q"].state == State.low
+        ff.calculate()
+        assert ff.outputs["Q"].state == State.high
+
+    def test_wrong_number_of_inputs_raises(self):
+        j = Node(State.low, name="J")
+        k = Node(State.low, name="K")
+        with pytest.raises(ValueError):
+            JKFlipFlop([j, k])
+
+
+@pytest.fixture(scope="module")
+def truth_words():
+    # Lane L of each word carries row L of the 3-input truth table, so a
+    # single simulate_batch call covers all eight input combinations with
+    # one gate construction instead of eight parametrized cases.
+    word_a = word_b = word_c = 0
+    for row in range(8):
+        word_a |= ((row >> 2) & 1) << row
+        word_b |= ((row >> 1) & 1) << row
+        word_c |= (row & 1) << row
+    return word_a, word_b, word_c
+
+
+class TestBatchedGateTruthTables:
+    @pytest.mark.parametrize(
+        "gate_class, expected",
+        (
+            (AndGate, lambda a, b, c: a and b and c),
+            (OrGate, lambda a, b, c: a or b or c),
+            (NandGate, lambda a, b, c: not (a and b and c)),
+            (NorGate, lambda a, b, c: not (a or b or c)),
+            (XorGate, lambda a, b, c: a + b + c == 1),
+            (XnorGate, lambda a, b, c: a + b + c != 1),
+        ),
+    )
+    def test_whole_truth_table_in_one_batch(self, truth_words, gate_class, expected):
+        from emulate import simulate_batch
+
+        word_a, word_b, word_c = truth_words
+        a = Node(name="A")
+        b = Node(name="B")
+        c = Node(name="C")
+        gate = gate_class([a, b, c])
+        results = simulate_batch(gate, {a: word_a, b: word_b, c: word_c}, lanes=8)
+        out_word = results[gate.outputs[0]]
+        for row in range(8):
+            bits = ((row >> 2) & 1, (row >> 1) & 1, row & 1)
+            assert (out_word >> row) & 1 == int(bool(expected(*bits)))